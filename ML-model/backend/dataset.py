@@ -1,10 +1,11 @@
-#This script generates a synthetic dataset of 20,000 flood risk samples for different zones in Dubai based on environmental conditions and saves it to a CSV file for machine learning use.
+#This script generates a synthetic dataset of 20,000 flood risk samples for different zones in Dubai based on environmental conditions and saves it to a Parquet file for machine learning use.
 
 import pandas as pd
 import numpy as np
 
 
-np.random.seed(42)
+# Single generator for all random draws
+rng = np.random.default_rng(42)
 
 # Define a DataFrame with basic information about different zones in Dubai
 zones_df = pd.DataFrame({
@@ -28,56 +29,61 @@ zones_df = pd.DataFrame({
 
 # Define the number of synthetic data samples to generate
 n_samples = 20000
-samples = []
 
-# Generate synthetic samples
-for _ in range(n_samples):
-    # Randomly select one zone from the predefined zones
-    zone_row = zones_df.sample(n=1).iloc[0]
-    
-    # Randomly generate environmental features
-    relative_humidity = np.random.uniform(30, 100)
-    wind_speed = np.random.uniform(0, 10)
-    cloud_coverage = np.random.uniform(0, 1)
-    bright_sunshine = np.random.uniform(0, 12)
-    avg_temp = np.random.uniform(15, 45)
-    
-    # Calculate a synthetic flood probability based on environmental factors and zone properties
-    flood_probability = (
-        0.4 * (zone_row['rainfall'] / 100) +
-        0.25 * (relative_humidity / 100) +
-        0.15 * cloud_coverage +
-        0.1  * (1 - bright_sunshine / 12) +
-        0.05 * (1 - (zone_row['elevation'] / 15)) +
-        0.05 * (zone_row['urban_density'] / 2)
-    )
-    
-    # Classify as flood (1) or no flood (0) based on threshold of 0.5
-    flood = 1 if flood_probability > 0.5 else 0
+# Randomly select one zone per sample (all samples drawn at once)
+zone_idx = rng.integers(0, len(zones_df), n_samples)
+zone = zones_df['zone'].to_numpy()[zone_idx]
+lat = zones_df['lat'].to_numpy()[zone_idx]
+lon = zones_df['lon'].to_numpy()[zone_idx]
+elevation = zones_df['elevation'].to_numpy()[zone_idx]
+urban_density = zones_df['urban_density'].to_numpy()[zone_idx]
+rainfall = zones_df['rainfall'].to_numpy()[zone_idx]
 
-    # Add the sample to the list
-    samples.append({
-        'Zone': zone_row['zone'],
-        'Latitude': zone_row['lat'],
-        'Longitude': zone_row['lon'],
-        'Elevation': zone_row['elevation'],
-        'Urban Density': zone_row['urban_density'],
-        'Rainfall': zone_row['rainfall'],
-        'Relative_Humidity': relative_humidity,
-        'Wind_Speed': wind_speed,
-        'Cloud_Coverage': cloud_coverage,
-        'Bright_Sunshine': bright_sunshine,
-        'Avg Temp': avg_temp,
-        'Flood?': flood,      # Flood label (redundant with 'Flood Risk')
-        'Flood Risk': flood   # Same flood label
-    })
+# Randomly generate environmental features
+relative_humidity = rng.uniform(30, 100, n_samples)
+wind_speed = rng.uniform(0, 10, n_samples)
+cloud_coverage = rng.uniform(0, 1, n_samples)
+bright_sunshine = rng.uniform(0, 12, n_samples)
+avg_temp = rng.uniform(15, 45, n_samples)
 
-# Convert all samples into a single DataFrame
-final_df = pd.DataFrame(samples)
+# Calculate a synthetic flood probability based on environmental factors and zone properties
+flood_probability = (
+    0.4 * (rainfall / 100) +
+    0.25 * (relative_humidity / 100) +
+    0.15 * cloud_coverage +
+    0.1  * (1 - bright_sunshine / 12) +
+    0.05 * (1 - (elevation / 15)) +
+    0.05 * (urban_density / 2)
+)
 
-# Save the dataset to a CSV file
-final_df.to_csv('../data/dubai_flood_dataset_20k.csv', index=False)
+# Classify as flood (1) or no flood (0) based on threshold of 0.5
+flood = (flood_probability > 0.5).astype(np.int8)
+
+# Build the final DataFrame directly from the sample arrays
+final_df = pd.DataFrame({
+    'Zone': zone,
+    'Latitude': lat,
+    'Longitude': lon,
+    'Elevation': elevation,
+    'Urban Density': urban_density,
+    'Rainfall': rainfall,
+    'Relative_Humidity': relative_humidity,
+    'Wind_Speed': wind_speed,
+    'Cloud_Coverage': cloud_coverage,
+    'Bright_Sunshine': bright_sunshine,
+    'Avg Temp': avg_temp,
+    'Flood?': flood,      # Flood label (redundant with 'Flood Risk')
+    'Flood Risk': flood   # Same flood label
+})
+
+# Store the model features as float32 so they load without a float64 blow-up downstream
+features = ['Relative_Humidity', 'Wind_Speed', 'Cloud_Coverage', 'Bright_Sunshine',
+            'Avg Temp', 'Elevation', 'Urban Density', 'Rainfall']
+final_df[features] = final_df[features].astype(np.float32)
+
+# Save the dataset to a Parquet file (binary, keeps dtypes, much faster to reload than CSV)
+final_df.to_parquet('../data/dubai_flood_dataset_20k.parquet', engine='pyarrow', compression='zstd', index=False)
 
 # Display first few rows to confirm
 print(final_df.head())
-print("\n 20,000 samples created and saved to 'dubai_flood_dataset_20k.csv'!")
+print("\n 20,000 samples created and saved to 'dubai_flood_dataset_20k.parquet'!")
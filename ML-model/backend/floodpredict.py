@@ -6,10 +6,17 @@
 import pandas as pd
 import numpy as np
 import joblib
-
-# Load the previously trained model and scaler
-model = joblib.load('flood_risk_model.pkl')
-scaler = joblib.load('scaler.pkl')
+import os
+
+# Optional: use the ONNX model or the Treelite-compiled model (built by trainmodel.py) when available
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+try:
+    import tl2cgen
+except ImportError:
+    tl2cgen = None
 
 # Load new region data for prediction
 regions_data = pd.read_csv('../data/region_data.csv')
@@ -18,27 +25,30 @@ regions_data = pd.read_csv('../data/region_data.csv')
 features = ['Relative_Humidity', 'Wind_Speed', 'Cloud_Coverage', 'Bright_Sunshine',
             'Avg Temp', 'Elevation', 'Urban Density', 'Rainfall']
 
-# Extract features and apply the same scaling as training
-region_features = regions_data[features]
-region_features_scaled = scaler.transform(region_features)
+# Extract features once as a C-contiguous float32 array (the dtype the trees use internally)
+region_features = np.ascontiguousarray(regions_data[features].to_numpy(dtype=np.float32))
 
 # Predict flood probabilities for each region
-region_probs = model.predict_proba(region_features_scaled)[:, 1]
+if ort is not None and os.path.exists('flood.onnx'):
+    # The ONNX graph stays float32 end-to-end
+    sess = ort.InferenceSession('flood.onnx', providers=['CPUExecutionProvider'])
+    region_probs = sess.run(None, {'X': region_features})[1][:, 1]
+elif tl2cgen is not None and os.path.exists('flood_model.so'):
+    predictor = tl2cgen.Predictor('./flood_model.so')
+    region_probs = predictor.predict(tl2cgen.DMatrix(region_features)).reshape(len(region_features), -1)[:, -1]
+else:
+    # Load the previously trained model
+    model = joblib.load('flood_risk_model.pkl')
+    region_probs = model.predict_proba(region_features)[:, 1]
 
 # Add flood probability to the dataset
 regions_data['Flood Probability'] = region_probs
 
-# Define a function to assign risk colors based on probability thresholds
-def assign_risk_color(prob):
-    if prob >= 0.7:
-        return 'Red'    # High risk
-    elif prob >= 0.4:
-        return 'Yellow' # Moderate risk
-    else:
-        return 'Green'  # Low risk
-
-# Apply risk color assignment to each region
-regions_data['Flood Risk Color'] = regions_data['Flood Probability'].apply(assign_risk_color)
+# Assign risk colors based on probability thresholds
+# Red: high risk (>= 0.7), Yellow: moderate risk (>= 0.4), Green: low risk
+regions_data['Flood Risk Color'] = np.select(
+    [region_probs >= 0.7, region_probs >= 0.4], ['Red', 'Yellow'], default='Green'
+)
 
 # Save the updated dataset to a new CSV file
 regions_data.to_csv('../data/region_flood_predictions.csv', index=False)
@@ -4,6 +4,8 @@
 import requests
 import json
 import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 # Load Dubai zones metadata from a local JSON file
 with open('../data/meta.json', 'r') as f:
@@ -20,41 +22,36 @@ def get_forecasted_rainfall(lat, lon):
     print(response)  # Print the response status for debugging
     data = response.json()
 
-    # Initialize rainfall to 0
-    rainfall = 0
-    
-    # Check if the response contains forecast data
-    if "list" in data:
-        # Loop through the first 24 forecast entries (~3-hour intervals = ~3 days)
-        for forecast in data["list"][:24]: 
-            # Check if rainfall data is present
-            if "rain" in forecast and "3h" in forecast["rain"]:
-                # Record the maximum rainfall amount seen across forecasts
-                rainfall = max(rainfall, forecast["rain"]["3h"])  
-    
-    return rainfall
+    # Record the maximum rainfall over the first 24 forecast entries (~3-hour intervals = ~3 days)
+    rain = np.fromiter((f.get("rain", {}).get("3h", 0.0) for f in data.get("list", [])[:24]), dtype=float)
+    rainfall = float(rain.max(initial=0.0))
 
-# Create a list to store rainfall results for each zone
-rainfall_results = []
+    return rainfall
 
-# Loop through all zones and collect forecasted rainfall data
-for zone in dubai_zones:
+# Fetch the forecast for one zone and build its result row
+def get_zone_rainfall(zone):
     rainfall = get_forecasted_rainfall(zone["lat"], zone["lon"])
-    rainfall_results.append({
+    return {
         "zone": zone["zone"],
         "lat": zone["lat"],
         "lon": zone["lon"],
         "elevation": zone["elevation"],
         "urban_density": zone["urban_density"],
         "rainfall": rainfall
-    })
-    print(f"Zone: {zone['zone']} | Forecasted Rainfall (max next 5 days): {rainfall} mm")
+    }
+
+# Request all zones concurrently (at most 8 in flight to respect the API rate limit)
+with ThreadPoolExecutor(max_workers=8) as executor:
+    rainfall_results = list(executor.map(get_zone_rainfall, dubai_zones))
+
+for result in rainfall_results:
+    print(f"Zone: {result['zone']} | Forecasted Rainfall (max next 5 days): {result['rainfall']} mm")
 
 # Convert the collected data into a pandas DataFrame
 df = pd.DataFrame(rainfall_results)
 
-# Save the DataFrame to a CSV file
-df.to_csv('../data/live_rainfall_data.csv', index=False)
+# Save the DataFrame to a Parquet file
+df.to_parquet('../data/live_rainfall_data.parquet', engine='pyarrow', compression='zstd', index=False)
 
 # Print a success message
-print("Forecasted rainfall data collected and saved to data/live_rainfall_data.csv")
\ No newline at end of file
+print("Forecasted rainfall data collected and saved to data/live_rainfall_data.parquet")
\ No newline at end of file
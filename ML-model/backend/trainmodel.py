@@ -1,40 +1,72 @@
-#Train a Random Forest model to predict flood risk based on weather, elevation, and urban density.
+#Train a histogram gradient boosting model to predict flood risk based on weather, elevation, and urban density.
 # Saves the model, evaluates performance, and plots flood probability distribution.
 
 # Import necessary libraries
 import pandas as pd
 import numpy as np
 import joblib   
+import os
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import roc_auc_score, confusion_matrix, classification_report
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Load the dataset
-df = pd.read_csv('../data/dubai_flood_dataset_20k.csv')
+# Optional: Treelite compiles the trained trees into a native predictor
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    treelite = tl2cgen = None
+
+# Optional: skl2onnx exports the model as an ONNX graph
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    convert_sklearn = None
+
+# Load the dataset (written by dataset.py)
+df = pd.read_parquet('../data/dubai_flood_dataset_20k.parquet', engine='pyarrow')
 
 # Select features (inputs) and target (output)
 features = ['Relative_Humidity', 'Wind_Speed', 'Cloud_Coverage', 'Bright_Sunshine',
             'Avg Temp', 'Elevation', 'Urban Density', 'Rainfall']
-X = df[features]
+X = df[features].to_numpy(dtype=np.float32)
 y = df['Flood?']  # Target variable (0: No flood, 1: Flood)
 
-# Standardize the feature values (important for consistent scaling)
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
+# No feature scaling or pre-binning: tree splits are invariant to monotonic rescaling,
+# and the histogram model bins each feature (uint8) internally
 # Split the data into training and testing sets (80% train, 20% test)
-X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Initialize and train a Random Forest Classifier
-model = RandomForestClassifier(random_state=42)
+# Initialize and train a Histogram Gradient Boosting Classifier (multi-threaded histogram split search)
+model = HistGradientBoostingClassifier(max_iter=200, max_leaf_nodes=31, learning_rate=0.05,
+                                       early_stopping=True, random_state=42)
 model.fit(X_train, y_train)
 
-# Save the trained model and scaler for future use
+# Save the trained model for future use
 joblib.dump(model, 'flood_risk_model.pkl')
-joblib.dump(scaler, 'scaler.pkl')
+
+# Compile the model to a shared library for fast inference in floodpredict.py
+if treelite is not None:
+    tl_model = treelite.sklearn.import_model(model)
+    tl2cgen.export_lib(tl_model, toolchain='gcc', libpath='./flood_model.so', params={'parallel_comp': 4})
+elif os.path.exists('flood_model.so'):
+    # Remove a library compiled from an earlier model so floodpredict.py does not serve it
+    os.remove('flood_model.so')
+
+# Export the model to ONNX so floodpredict.py can serve it with onnxruntime
+# (zipmap disabled so probabilities come back as a plain float tensor)
+if convert_sklearn is not None:
+    onx = convert_sklearn(model,
+                          initial_types=[('X', FloatTensorType([None, len(features)]))],
+                          options={id(model): {'zipmap': False}})
+    with open('flood.onnx', 'wb') as f:
+        f.write(onx.SerializeToString())
+elif os.path.exists('flood.onnx'):
+    # Remove a graph exported from an earlier model so floodpredict.py does not serve it
+    os.remove('flood.onnx')
 
 # Predict probabilities of flood on the test set
 flood_probabilities = model.predict_proba(X_test)[:, 1]  # Take probability of class 1 (flood)
@@ -7,7 +7,7 @@ $ pip install dwave-ocean-sdk networkx qiskit-optimization docplex
 Usage
 -----
 $ export DWAVE_API_TOKEN="<your-token>"
-$ python run_on_dwave.py toy_problem.json
+$ python run_on_dwave.py toy_problem.json [--no-cache]
 
 The script
 1. loads the JSON problem description (same schema as before),
@@ -18,10 +18,11 @@ The script
 """
 from __future__ import annotations
 
-import json, pathlib, sys, collections
+import hashlib, json, pathlib, shutil, sys, collections
 from typing import Dict, Tuple, Any
 
 import networkx as nx
+import numpy as np
 from qiskit_optimization.translators import from_docplex_mp
 from qiskit_optimization.converters import QuadraticProgramToQubo
 from qiskit_optimization import QuadraticProgram
@@ -29,7 +30,7 @@ import dimod
 from dwave.system import DWaveSampler, EmbeddingComposite
 
 # ---- import the builder from the previous module --------------------------
-from flow_qubo import build_qubo, flows_from_result
+from flow_qubo import CACHE_DIR, build_qubo, cached_build_qubo, config_key, flows_from_result, write_cache_file
 
 # ---------------------------------------------------------------------------
 # helper: convert QuadraticProgram -> dimod.BQM
@@ -38,10 +39,18 @@ from flow_qubo import build_qubo, flows_from_result
 def qp_to_bqm(qp: QuadraticProgram) -> dimod.BinaryQuadraticModel:
     # ensure it's a pure QUBO (quadratic + linear, minimisation)
     qp_qubo = QuadraticProgramToQubo().convert(qp)
-    linear  = {v.name: coeff for v, coeff in qp_qubo.objective.linear.to_dict().items()}
-    quad    = { (qp_qubo.variables[i].name, qp_qubo.variables[j].name): coeff
-                for (i,j), coeff in qp_qubo.objective.quadratic.to_dict().items() }
-    bqm = dimod.BinaryQuadraticModel(linear, quad, qp_qubo.objective.constant, dimod.BINARY)
+    # read the sparse coefficient storage directly instead of building per-term dicts
+    linear = qp_qubo.objective.linear.to_array()
+    Q = qp_qubo.objective.quadratic.coefficients.tocoo()
+    # x_i * x_i == x_i for binaries: fold the diagonal into the linear biases
+    diag = Q.row == Q.col
+    np.add.at(linear, Q.row[diag], Q.data[diag])
+    off = ~diag
+    names = [v.name for v in qp_qubo.variables]
+    bqm = dimod.BinaryQuadraticModel.from_numpy_vectors(
+        linear, (Q.row[off], Q.col[off], Q.data[off]), qp_qubo.objective.constant, dimod.BINARY,
+        variable_order=names,
+    )
     return bqm
 
 # ---------------------------------------------------------------------------
@@ -49,11 +58,13 @@ def qp_to_bqm(qp: QuadraticProgram) -> dimod.BinaryQuadraticModel:
 # ---------------------------------------------------------------------------
 
 def main():
-    if len(sys.argv) < 2:
-        print("usage: python run_on_dwave.py problem.json")
+    no_cache = "--no-cache" in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != "--no-cache"]
+    if len(args) < 1:
+        print("usage: python run_on_dwave.py problem.json [--no-cache]")
         sys.exit(1)
 
-    data_path = pathlib.Path(sys.argv[1])
+    data_path = pathlib.Path(args[0])
     data = json.loads(data_path.read_text())
 
     # convert dictionaries with "U,V" keys to tuple keys ---------------
@@ -61,20 +72,43 @@ def main():
         return {tuple(k.split(',')) if isinstance(k, str) else k: v for k, v in d.items()}
 
     G = nx.DiGraph(data["edges"])
-    qp, var_map = build_qubo(
-        G,
-        data["node_capacity"],
-        data["node_risk"],
-        keys_to_tuple(data["pipe_capacity"]),
-        keys_to_tuple(data["energy_cost"]),
-        bits_per_edge=data.get("bits", 3),
-        flow_quantum=data.get("delta", 1.0),
-        λ=data.get("lambda", 0.5),
-        energy_budget=data.get("energy_budget"),
-    )
 
-    # build BinaryQuadraticModel ---------------------------------------
-    bqm = qp_to_bqm(qp)
+    def build():
+        return build_qubo(
+            G,
+            data["node_capacity"],
+            data["node_risk"],
+            keys_to_tuple(data["pipe_capacity"]),
+            keys_to_tuple(data["energy_cost"]),
+            bits_per_edge=data.get("bits", 3),
+            flow_quantum=data.get("delta", 1.0),
+            λ=data.get("lambda", 0.5),
+            energy_budget=data.get("energy_budget"),
+        )
+
+    if no_cache:
+        qp, var_map = build()
+        bqm = qp_to_bqm(qp)
+    else:
+        key = config_key(data_path)
+        qp, var_map = cached_build_qubo(key, build)
+
+        # build BinaryQuadraticModel (cached alongside the QUBO); the key also hashes this
+        # module and the dimod version so editing qp_to_bqm never serves a stale BQM
+        bqm_key = hashlib.sha1(
+            key.encode() + pathlib.Path(__file__).read_bytes() + dimod.__version__.encode()
+        ).hexdigest()
+        bqm_path = CACHE_DIR / f"{bqm_key}.bqm"
+        bqm = None
+        if bqm_path.exists():
+            try:
+                with bqm_path.open("rb") as f:
+                    bqm = dimod.BinaryQuadraticModel.from_file(f)
+            except Exception as exc:  # truncated or incompatible entry: rebuild it
+                print(f"[warn] ignoring unreadable cache entry {bqm_path.name}: {exc}", file=sys.stderr)
+        if bqm is None:
+            bqm = qp_to_bqm(qp)
+            write_cache_file(bqm_path, lambda f: shutil.copyfileobj(bqm.to_file(), f))
 
     # --- sample on D-Wave ---------------------------------------------
     sampler = EmbeddingComposite(DWaveSampler())
@@ -10,12 +10,13 @@ Call pattern
 ------------
 ```
 python main.py  problem.json [--out qubo.lp] [--solve exact|qaoa] \
-                                         [--shots 1024] [--seed 123]
+                                         [--shots 1024] [--seed 123] [--no-cache]
 ```
 * `problem.json` - see bottom for schema.
 * `--solve exact`   : uses `NumPyMinimumEigensolver`  (good ≤20 qubits)
 * `--solve qaoa`    : 2-layer QAOA + COBYLA, backend = sampler simulator.
 * omit `--solve`    : just export the LP/QUBO.
+* `--no-cache`      : rebuild the QUBO instead of loading `cache/<sha1>.qp.pkl`.
 
 Returned on stdout
 ------------------
@@ -55,14 +56,15 @@ pip install networkx docplex "qiskit-optimization>=0.6" qiskit_algorithms
 """
 from __future__ import annotations
 
-import argparse, json, math, pathlib, re, sys
-from typing import Any, Dict, Iterable, Tuple, Union
+import argparse, functools, hashlib, json, math, os, pathlib, pickle, re, sys
+from typing import Any, Callable, Dict, Iterable, Tuple, Union
 
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
 import networkx as nx  # optional
-from docplex.mp.model import Model
-from qiskit_optimization.translators import from_docplex_mp
+import scipy.sparse as sp
+import qiskit_optimization
 from qiskit_optimization import QuadraticProgram, algorithms as opt_alg
 from qiskit_algorithms import NumPyMinimumEigensolver, QAOA
 from qiskit_algorithms.optimizers import COBYLA
@@ -73,7 +75,7 @@ Node = Any
 Edge = Tuple[Node, Node]
 
 ###############################################################################
-# QUBO builder (unchanged semantics)
+# QUBO builder (unchanged semantics, Q assembled directly as a sparse matrix)
 ###############################################################################
 
 def build_qubo(
@@ -116,93 +118,165 @@ def build_qubo(
     if (missing := set(edges) - energy_cost.keys()):
         raise ValueError(f"missing energy cost for {missing}")
 
-    mdl = Model(name=name, ignore_names=True)
-    
     var_map: Dict[str, Tuple[Edge, int, float]] = {}
 
-    # binary vars x_e_k ------------------------------------------------------
-    def add_binary(e: Edge, k: int):
-        vname = f"x_{e[0]}_{e[1]}_{k}"
-        var = mdl.binary_var(name=vname)
-        var_map[vname] = (e, k, (2 ** k) * flow_quantum)
-        return var
-
-    x = {(e, k): add_binary(e, k) for e in edges for k in range(bits_per_edge)}
-
-    def flow_expr(e: Edge):
-        return mdl.sum((2 ** k) * x[(e, k)] for k in range(bits_per_edge)) * flow_quantum
+    # binary vars x_e_k, flat index i = edge_index * bits_per_edge + k --------
+    n_edges, n_bits = len(edges), len(edges) * bits_per_edge
+    for e in edges:
+        for k in range(bits_per_edge):
+            var_map[f"x_{e[0]}_{e[1]}_{k}"] = (e, k, (2 ** k) * flow_quantum)
+    bit_idx = np.arange(n_bits).reshape(n_edges, bits_per_edge)  # row = edge
+    bit_weight = (2.0 ** np.arange(bits_per_edge)) * flow_quantum  # flow_e = bit_weight @ x_e
+
+    # each edge's contribution to its head/tail node, collected in one pass --
+    inflow: Dict[Node, list] = {n: [] for n in nodes}
+    outflow: Dict[Node, list] = {n: [] for n in nodes}
+    for i, (u, v) in enumerate(edges):
+        outflow[u].append(i)
+        inflow[v].append(i)
 
     # objective --------------------------------------------------------------
-    
-    # obj = mdl.constant(0)
-    obj = 0
-    for e in edges:
-        u, v = e
-        weight = (1 - 0.5 * λ * (node_risk[u] + node_risk[v])) * flow_quantum
-        obj -= weight * mdl.sum((2 ** k) * x[(e, k)] for k in range(bits_per_edge))
+    linear = np.zeros(n_bits)
+    rows, cols, vals = [np.empty(0, int)], [np.empty(0, int)], [np.empty(0)]
+    constant = 0.0
+
+    def add_square(idx: np.ndarray, c: np.ndarray, target: float, penalty: float):
+        """Add penalty * (sum_i c_i x_i - target)**2, using x_i**2 == x_i."""
+        nonlocal constant
+        constant += penalty * target ** 2
+        linear[idx] += penalty * (c ** 2 - 2 * target * c)
+        iu, ju = np.triu_indices(len(idx), 1)
+        rows.append(idx[iu])
+        cols.append(idx[ju])
+        vals.append(2 * penalty * c[iu] * c[ju])
+
+    # risk-weighted flow reward, all edges at once
+    risk = np.array([node_risk[u] + node_risk[v] for u, v in edges])
+    linear -= ((1 - 0.5 * λ * risk)[:, None] * bit_weight).ravel()
 
     for n in nodes:
-        inflow = mdl.sum(flow_expr(e) for e in edges if e[1] == n)
-        outflow = mdl.sum(flow_expr(e) for e in edges if e[0] == n)
-        obj += penalty_node * (inflow - node_capacity[n]) ** 2
-        obj += penalty_node * (outflow - node_capacity[n]) ** 2
-
-    for e in edges:
-        obj += penalty_pipe * (flow_expr(e) - pipe_capacity[e]) ** 2
+        for node_edges in (inflow[n], outflow[n]):
+            add_square(bit_idx[node_edges].ravel(), np.tile(bit_weight, len(node_edges)),
+                       node_capacity[n], penalty_node)
+
+    # pipe capacity squares share the same bit pattern on every edge
+    caps = np.array([pipe_capacity[e] for e in edges], dtype=float)
+    iu, ju = np.triu_indices(bits_per_edge, 1)
+    constant += penalty_pipe * np.sum(caps ** 2)
+    linear += penalty_pipe * (bit_weight ** 2 - 2 * caps[:, None] * bit_weight).ravel()
+    rows.append(bit_idx[:, iu].ravel())
+    cols.append(bit_idx[:, ju].ravel())
+    vals.append(np.tile(2 * penalty_pipe * bit_weight[iu] * bit_weight[ju], n_edges))
 
     if energy_budget is not None:
-        totE = mdl.sum(energy_cost[e] * flow_expr(e) for e in edges)
-        obj += penalty_energy * (totE - energy_budget) ** 2
+        cost = np.array([energy_cost[e] for e in edges], dtype=float)
+        add_square(bit_idx.ravel(), (cost[:, None] * bit_weight).ravel(), energy_budget, penalty_energy)
+
+    Q = sp.coo_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_bits, n_bits),
+    )
+
+    qp = QuadraticProgram(name)
+    qp.binary_var_list(n_bits)
+    qp.minimize(constant=constant, linear=linear, quadratic=Q)
+    return qp, var_map
+
+###############################################################################
+# QUBO cache
+###############################################################################
+
+CACHE_DIR = pathlib.Path(__file__).parent / "cache"
+
+
+def config_key(path: pathlib.Path) -> str:
+    """Cache key for a problem file: SHA-1 of its raw bytes, this module's source and the
+    qiskit-optimization version.
+
+    Hashing the builder source too means an edited ``build_qubo`` never serves a stale QUBO.
+    """
+    return hashlib.sha1(
+        path.read_bytes() + pathlib.Path(__file__).read_bytes() + qiskit_optimization.__version__.encode()
+    ).hexdigest()
 
-    mdl.minimize(obj)
 
-    qp = from_docplex_mp(mdl)
+def write_cache_file(path: pathlib.Path, write: Callable[[Any], None]) -> None:
+    """Write a cache entry via *write(file)* to a temp file, then move it into place atomically."""
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def cached_build_qubo(
+    key: str,
+    build: Callable[[], Tuple[QuadraticProgram, Dict[str, Tuple[Edge, int, float]]]],
+) -> Tuple[QuadraticProgram, Dict[str, Tuple[Edge, int, float]]]:
+    """Return (QuadraticProgram, var_map) from ``cache/<key>.qp.pkl``, calling *build* on a miss."""
+    path = CACHE_DIR / f"{key}.qp.pkl"
+    if path.exists():
+        try:
+            with path.open("rb") as f:
+                return pickle.load(f)
+        except Exception as exc:  # truncated or incompatible entry: rebuild it
+            print(f"[warn] ignoring unreadable cache entry {path.name}: {exc}", file=sys.stderr)
+    qp, var_map = build()
+    write_cache_file(path, lambda f: pickle.dump((qp, var_map), f))
     return qp, var_map
 
 ###############################################################################
 # Solver helpers
 ###############################################################################
 
-def solve_qp(qp: QuadraticProgram, method: str = "exact", shots: int = 1024, seed: int | None = None):
+@functools.lru_cache(maxsize=2)
+def _get_solver(method: str) -> opt_alg.MinimumEigenOptimizer:
+    """Build the optimizer for *method* once and reuse it on later calls."""
     if method == "exact":
         eig = NumPyMinimumEigensolver()
-        solver = opt_alg.MinimumEigenOptimizer(eig)
+        return opt_alg.MinimumEigenOptimizer(eig)
     elif method == "qaoa":
         qaoa = QAOA(sampler=Sampler(), reps=2, optimizer=COBYLA())
-        solver = opt_alg.MinimumEigenOptimizer(qaoa)
-    else:
-        raise ValueError("method must be 'exact' or 'qaoa'")
-    return solver.solve(qp)
+        return opt_alg.MinimumEigenOptimizer(qaoa)
+    raise ValueError("method must be 'exact' or 'qaoa'")
+
+
+def solve_qp(qp: QuadraticProgram, method: str = "exact", shots: int = 1024, seed: int | None = None):
+    return _get_solver(method).solve(qp)
 
 
 def flows_from_result(result, var_map: Dict[str, Tuple[Edge, int, float]]):
     flows: Dict[Edge, float] = {}
-    
-    # Create a list of var_map items to map indices to original variables
-    var_map_items = list(var_map.items())
-    
-    # Debug information
-    if any(name.startswith('x') and name[1:].isdigit() for name in result.variables_dict.keys()):
-        print("Info: Using indexed variables mapping")
-    
+
+    # Indexed variable names ('x0', 'x1', ...) map to var_map entries by position
+    idx_map = {f"x{i}": v for i, v in enumerate(var_map.values())}
+
     for name, value in result.variables_dict.items():
         if value > 0.5:  # binary 1
-            # For variable names like 'x0', 'x1', etc., extract the index
-            if name.startswith('x') and name[1:].isdigit():
-                idx = int(name[1:])
-                if 0 <= idx < len(var_map_items):
-                    orig_name, (e, _, weight) = var_map_items[idx]
-                    flows[e] = flows.get(e, 0.0) + weight
-                    print(f"Mapped {name} (value={value}) to {orig_name}: edge={e}, weight={weight}")
-            # For original variable names if they exist in the result
-            elif name in var_map:
-                e, _, weight = var_map[name]
+            # fall back to original variable names if they exist in the result
+            entry = idx_map.get(name) or var_map.get(name)
+            if entry:
+                e, _, weight = entry
                 flows[e] = flows.get(e, 0.0) + weight
-                print(f"Direct match for {name}: edge={e}, weight={weight}")
-    
+
     return flows
 
 
+def cached_layout(G: nx.DiGraph) -> Dict[Node, np.ndarray]:
+    """Kamada-Kawai layout of *G*, stored in ``cache/<sha1 of edges>.layout.npy``."""
+    order = sorted(G.nodes, key=str)
+    key = hashlib.sha1(repr(sorted(map(str, G.edges))).encode()).hexdigest()
+    path = CACHE_DIR / f"{key}.layout.npy"
+    if path.exists():
+        try:
+            return dict(zip(order, np.load(path)))
+        except Exception as exc:  # truncated entry: recompute it
+            print(f"[warn] ignoring unreadable cache entry {path.name}: {exc}", file=sys.stderr)
+    pos = nx.kamada_kawai_layout(G)
+    write_cache_file(path, lambda f: np.save(f, np.array([pos[n] for n in order])))
+    return pos
+
+
 def draw_solution(G: nx.DiGraph, flows: Dict[Edge, float], node_cap: Dict[Node, float], pipe_cap: Dict[Edge, float]):
     """Draw the network solution with professional blues styling and informative color coding"""
     plt.figure(figsize=(14, 10), facecolor='white')  # Larger figure size
@@ -211,14 +285,16 @@ def draw_solution(G: nx.DiGraph, flows: Dict[Edge, float], node_cap: Dict[Node,
     plt.style.use('seaborn-v0_8-whitegrid')
     
     # Compute utilisation ratios -------------------------------------------
-    edge_util = {e: min(flows.get(e, 0.0) / pipe_cap[e], 1.0) for e in G.edges}
+    flows_arr = np.fromiter((flows.get(e, 0.0) for e in G.edges), float)
+    caps = np.fromiter((pipe_cap[e] for e in G.edges), float)
+    edge_util = dict(zip(G.edges, np.minimum(flows_arr / caps, 1.0)))
     node_util: Dict[Node, float] = {n: 0.0 for n in G.nodes}
     for n in G.nodes:
         used = sum(flows.get(e, 0.0) for e in G.in_edges(n))
         node_util[n] = min(used / node_cap[n], 1.0) if node_cap[n] else 0.0
 
-    # Create layout --------------------------------------------------------
-    pos = nx.kamada_kawai_layout(G)
+    # Create layout (cached per edge set) ----------------------------------
+    pos = cached_layout(G)
     scale = 1.2  
     for node in pos:
         pos[node] = [coord * scale for coord in pos[node]]
@@ -314,6 +390,7 @@ def main(argv=None):
     p.add_argument("--shots", type=int, default=1024, help="sampler shots for QAOA")
     p.add_argument("--viz", action="store_true", help="plot network with utilisation colours")
     p.add_argument("--seed", type=int, default=None, help="random seed")
+    p.add_argument("--no-cache", action="store_true", help="rebuild the QUBO instead of reusing cache/")
     args = p.parse_args(argv)
     
     def tuple_keys(d):
@@ -325,17 +402,20 @@ def main(argv=None):
     data['energy_cost'] = {tuple(key.split(',')): val for key, val in data["energy_cost"].items()}
     G = nx.DiGraph(data["edges"]) if nx else data["edges"]
 
-    qp, vmap = build_qubo(
-        G,
-        data["node_capacity"],
-        data["node_risk"],
-        data["pipe_capacity"],
-        data["energy_cost"],
-        bits_per_edge=data.get("bits", 3),
-        flow_quantum=data.get("delta", 1.0),
-        λ=data.get("lambda", 0.5),
-        energy_budget=data.get("energy_budget"),
-    )
+    def build():
+        return build_qubo(
+            G,
+            data["node_capacity"],
+            data["node_risk"],
+            data["pipe_capacity"],
+            data["energy_cost"],
+            bits_per_edge=data.get("bits", 3),
+            flow_quantum=data.get("delta", 1.0),
+            λ=data.get("lambda", 0.5),
+            energy_budget=data.get("energy_budget"),
+        )
+
+    qp, vmap = build() if args.no_cache else cached_build_qubo(config_key(args.NETWORK_CONFIG), build)
 
     if args.out:
         args.out.write_text(qp.export_as_lp_string())